@@ -1,4 +1,4 @@
-from typing import Iterable, Optional, List
+from typing import Iterable, Optional, List, Callable
 
 import pygame as pg
 
@@ -6,8 +6,27 @@ from peng_ui.elements.base_element import BaseElement
 from peng_ui.utils import RenderContext
 
 
-class Container:
+class EventDispatcher:
+    """
+    Forwards events to all elements returned by iter_elements().
+    """
     def __init__(self):
+        # Bound handle_event methods of all elements, so dispatching an event does not look them up per element
+        self._event_handler_cache: Optional[List[Callable[[pg.event.Event], None]]] = None
+
+    def iter_elements(self) -> Iterable:
+        raise NotImplementedError()
+
+    def _dispatch_to_elements(self, event: pg.event.Event):
+        if self._event_handler_cache is None:
+            self._event_handler_cache = [elem.handle_event for elem in self.iter_elements()]
+        for handle_event in self._event_handler_cache:
+            handle_event(event)
+
+
+class Container(EventDispatcher):
+    def __init__(self):
+        super().__init__()
         self._element_cache: Optional[List[BaseElement]] = None
 
     def iter_elements(self) -> Iterable[BaseElement]:
@@ -20,9 +39,11 @@ class Container:
 
         yield from self._element_cache
 
+    def needs_redraw(self) -> bool:
+        return any(elem.needs_redraw() for elem in self.iter_elements())
+
     def handle_event(self, event: pg.event.Event):
-        for elem in self.iter_elements():
-            elem.handle_event(event)
+        self._dispatch_to_elements(event)
 
     def render(self, screen: pg.Surface, render_context: RenderContext):
         for element in self.iter_elements():
@@ -1,9 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import final
 
 import pygame as pg
 
-from peng_ui.utils import RenderContext
+from peng_ui.utils import RenderContext, cursor_blink_on
 
 
 class BaseElement(ABC):
@@ -11,10 +10,23 @@ class BaseElement(ABC):
     Defines a base element class with different methods to implement functionality of ui elements.
     """
     def __init__(self, rect: pg.Rect):
-        self.visible: bool = True
         self.is_hovered: bool = False
         self.rect: pg.Rect = rect
         self.is_clicked: bool = False
+        self.dirty: bool = True  # Whether the element changed and has to be drawn again
+        self.visible = True
+
+    @property
+    def visible(self) -> bool:
+        return self._visible
+
+    @visible.setter
+    def visible(self, visible: bool):
+        self._visible = visible
+        # Select the render method once here, instead of checking the visibility for every frame.
+        # render(screen, render_context) draws the element and resets its state for the next frame.
+        self.render = self._render_visible if visible else self._render_hidden
+        self.dirty = True
 
     @abstractmethod
     def handle_event(self, event: pg.event.Event):
@@ -32,26 +44,55 @@ class BaseElement(ABC):
     def draw(self, screen: pg.Surface, render_context: RenderContext):
         """
         Draw the element to the given screen surface. Do not call this directly. Prefer render().
+        Drawing should stay inside of self.rect, if the viewer only updates the areas covered by elements (see
+        Viewer.partial_repaint).
 
         :param screen: The screen surface to draw on.
         :param render_context: The render context to use for rendering.
         """
         pass
 
+    def needs_redraw(self) -> bool:
+        """
+        Whether the element has to be drawn again, although no event occurred. Elements that change over time (e.g. a
+        blinking cursor) should override this.
+        """
+        return self.dirty
+
     def finalize(self):
         """
         Called at the end of a frame.
         """
         self.is_clicked = False
 
-    @final
-    def render(self, screen: pg.Surface, render_context: RenderContext):
+    def _render_visible(self, screen: pg.Surface, render_context: RenderContext):
         """
-        Draw the element to the given screen surface.
+        Draw the element to the given screen surface. This is the render() method of visible elements.
 
         :param screen: The screen surface to draw on.
         :param render_context: The render context to use for rendering.
         """
-        if self.visible:
-            self.draw(screen, render_context)
+        self.draw(screen, render_context)
+        self.dirty = False
         self.finalize()
+
+    def _render_hidden(self, _screen: pg.Surface, _render_context: RenderContext):
+        """
+        The render() method of hidden elements. Nothing is drawn, but the frame state is reset like for visible ones.
+        """
+        self.dirty = False
+        self.finalize()
+
+
+class CursorElement(BaseElement):
+    """
+    Base class of elements with a blinking text cursor. The cursor is drawn again, whenever it toggles.
+    """
+    def __init__(self, rect: pg.Rect):
+        super().__init__(rect)
+        self.is_focused: bool = False  # Whether the element is focused
+        self._cursor_shown: bool = False  # Whether the cursor was visible in the last drawn frame. Updated by draw().
+
+    def needs_redraw(self) -> bool:
+        # A hidden element is not drawn, so its cursor never toggles
+        return self.dirty or (self.visible and (self.is_focused and cursor_blink_on()) != self._cursor_shown)
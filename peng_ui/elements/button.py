@@ -3,7 +3,7 @@ from typing import Optional
 import pygame as pg
 
 from peng_ui.elements.base_element import BaseElement
-from peng_ui.utils import RenderContext, ColorType
+from peng_ui.utils import RenderContext, ColorType, blit_text, to_display_format
 
 
 class Button(BaseElement):
@@ -42,6 +42,5 @@ class Button(BaseElement):
         # Render text
         if self.text:
             if self.text_surface is None:
-                self.text_surface = render_context.font.render(self.text, True, self.text_color)
-            text_rect = self.text_surface.get_rect(center=self.rect.center)
-            screen.blit(self.text_surface, text_rect)
+                self.text_surface = to_display_format(render_context.font.render(self.text, True, self.text_color))
+            blit_text(screen, self.text_surface, self.rect.center, 'center')
@@ -2,13 +2,15 @@ from typing import Optional, Tuple
 
 import pygame as pg
 
-from peng_ui.elements.base_element import BaseElement
-from peng_ui.utils import RenderContext, ColorType, load_font
+from peng_ui.elements.base_element import CursorElement
+from peng_ui.glyph_atlas import GlyphAtlas
+from peng_ui.utils import RenderContext, ColorType, load_font, blit_text, cursor_blink_on, to_display_format
 
 SCRAP_TEXT = 'text/plain;charset=utf-8'
+PLACEHOLDER_COLOR = (100, 100, 100)
 
 
-class EditField(BaseElement):
+class EditField(CursorElement):
     def __init__(
             self, rect: pg.Rect, text: str = "", placeholder: str = "",
             bg_color: ColorType = (40, 40, 40), hover_color: ColorType = (60, 60, 60),
@@ -17,7 +19,7 @@ class EditField(BaseElement):
     ):
         super().__init__(rect)
         self.text = text
-        self.placeholder = placeholder
+        self._placeholder = placeholder
 
         self.bg_color = bg_color
         self.hover_color = hover_color
@@ -28,11 +30,29 @@ class EditField(BaseElement):
 
         self.cursor_pos: int = len(text)  # Cursor position in text
         self.selection_start: Optional[int] = None  # Start of text selection
-        self.is_focused: bool = False  # Whether the field is focused
         self.mouse_down_pos: Optional[int] = None  # For tracking drag selection
         self.text_offset: int = 0  # Horizontal scroll offset for text
 
         self.font = load_font()
+        # The text changes with every keystroke, so it is drawn and measured glyph by glyph
+        self.atlas = GlyphAtlas(self.font)
+        self._placeholder_surface: Optional[pg.Surface] = self._render_placeholder()
+
+    @property
+    def placeholder(self) -> str:
+        return self._placeholder
+
+    @placeholder.setter
+    def placeholder(self, placeholder: str):
+        self._placeholder = placeholder
+        self._placeholder_surface = self._render_placeholder()
+        self.dirty = True
+
+    def _render_placeholder(self) -> Optional[pg.Surface]:
+        """The placeholder rarely changes, so it is rendered once instead of on every frame."""
+        if not self._placeholder:
+            return None
+        return to_display_format(self.font.render(self._placeholder, True, PLACEHOLDER_COLOR))
 
     def _get_char_index_at_pos(self, pos: Tuple[int, int]) -> int:
         """Calculate the character index in text based on mouse position."""
@@ -47,14 +67,16 @@ class EditField(BaseElement):
             return 0
 
         # Find the closest character position
+        prev_width = 0
+        text_width = 0
         for i in range(len(self.text) + 1):
-            text_width = self.font.size(self.text[:i])[0]
+            if i > 0:
+                prev_width = text_width
+                text_width += self.atlas.advance(self.text[i - 1])
             if rel_x <= text_width:
                 # Check if we're closer to previous or current position
-                if i > 0:
-                    prev_width = self.font.size(self.text[:i - 1])[0]
-                    if rel_x - prev_width < text_width - rel_x:
-                        return i - 1
+                if i > 0 and rel_x - prev_width < text_width - rel_x:
+                    return i - 1
                 return i
 
         return len(self.text)
@@ -163,7 +185,7 @@ class EditField(BaseElement):
 
         # Calculate cursor position in text coordinates
         text_before_cursor = self.text[:self.cursor_pos]
-        cursor_x = self.font.size(text_before_cursor)[0]
+        cursor_x = self.atlas.text_width(text_before_cursor)
 
         # Adjust offset to keep cursor visible
         # If cursor is to the right of visible area, scroll right
@@ -365,8 +387,8 @@ class EditField(BaseElement):
                 text_before_selection = self.text[:start]
                 selected_text = self.text[start:end]
 
-                before_width = self.font.size(text_before_selection)[0]
-                selection_width = self.font.size(selected_text)[0]
+                before_width = self.atlas.text_width(text_before_selection)
+                selection_width = self.atlas.text_width(selected_text)
 
                 selection_rect = pg.Rect(
                     text_x + before_width,
@@ -379,25 +401,22 @@ class EditField(BaseElement):
 
         # Render text or placeholder
         if self.text:
-            text_surface = self.font.render(self.text, True, self.text_color)
-            text_rect = text_surface.get_rect(midleft=(text_x, text_y))
-            screen.blit(text_surface, text_rect)
-        elif not self.is_focused and self.placeholder:
+            self.atlas.draw(screen, self.text, self.text_color, (text_x, text_y), 'midleft')
+        elif not self.is_focused and self._placeholder_surface is not None:
             # Draw placeholder text in a dimmer color
-            placeholder_color = (100, 100, 100)
-            placeholder_surface = self.font.render(self.placeholder, True, placeholder_color)
-            placeholder_rect = placeholder_surface.get_rect(midleft=(text_x, text_y))
-            screen.blit(placeholder_surface, placeholder_rect)
+            blit_text(screen, self._placeholder_surface, (text_x, text_y), 'midleft')
 
         # Draw cursor if focused
+        self._cursor_shown = False
         if self.is_focused:
             # Blink cursor (using time-based blinking)
-            cursor_visible = (pg.time.get_ticks() // 500) % 2 == 0
+            cursor_visible = cursor_blink_on()
 
             if cursor_visible:
+                self._cursor_shown = True
                 # Calculate cursor position
                 text_before_cursor = self.text[:self.cursor_pos]
-                cursor_x = text_x + self.font.size(text_before_cursor)[0]
+                cursor_x = text_x + self.atlas.text_width(text_before_cursor)
 
                 cursor_height = text_area.height
                 cursor_top = text_area.top
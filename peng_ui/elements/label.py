@@ -3,7 +3,7 @@ from typing import Optional
 import pygame as pg
 
 from peng_ui.elements.base_element import BaseElement
-from peng_ui.utils import RenderContext, ColorType, Align
+from peng_ui.utils import RenderContext, ColorType, Align, to_display_format
 
 
 class Label(BaseElement):
@@ -24,6 +24,7 @@ class Label(BaseElement):
     def set_text(self, text: str):
         self._text = text
         self._text_surface = None
+        self.dirty = True
 
     def draw(self, screen: pg.Surface, render_context: RenderContext):
         if self.bg_color:
@@ -31,6 +32,6 @@ class Label(BaseElement):
 
         if self._text:
             if self._text_surface is None:
-                self._text_surface = render_context.font.render(self._text, True, self.text_color)
+                self._text_surface = to_display_format(render_context.font.render(self._text, True, self.text_color))
             rect = self.align.align_in(self._text_surface.get_rect(), self.rect)
             screen.blit(self._text_surface, rect)
@@ -1,9 +1,13 @@
-from typing import Optional, Tuple, List, Union, Iterable
+import bisect
+import itertools
+from array import array
+from typing import Optional, Tuple, List, Union, Iterable, Iterator
 
 import pygame as pg
 
-from peng_ui.elements.base_element import BaseElement
-from peng_ui.utils import RenderContext, ColorType, load_font
+from peng_ui.elements.base_element import CursorElement
+from peng_ui.glyph_atlas import GlyphAtlas
+from peng_ui.utils import RenderContext, ColorType, MeasuredFont, load_font, cursor_blink_on
 
 SCRAP_TEXT = 'text/plain;charset=utf-8'
 
@@ -60,23 +64,86 @@ class Line:
     Represents a line in a text field. Can contain multiple paragraphs that are automatically wrapped.
     Each manual enter from the user will create a new Line object. Each line that is longer than the width of the
     TextField will create a new paragraph.
+
+    The unwrapped text of the line is kept as a single string. Wrapping only replaces one space between two words by a
+    paragraph break, so joining the paragraphs with spaces always results in this text again.
     """
     def __init__(self, text: Union[str, List[str]] = ''):
         if isinstance(text, str):
             text = [text]
-        self.paragraphs: List[str] = text
+        self.paragraphs = text
+        self._wrapped_width: Optional[int] = None  # The max width of the last wrap, None if the content changed since
 
     def __repr__(self):
         # return f'Line({len(self.paragraphs)} paragraphs, {self.num_chars()} chars)'
         return str(self.paragraphs)
 
+    @property
+    def paragraphs(self) -> List[str]:
+        """
+        The paragraphs of the line as list of strings. The list is created on every access, use paragraph() to get a
+        single paragraph.
+        """
+        raw = self._raw
+        return [raw[start:end] for start, end in zip(self._iter_starts(), self._ends)]
+
+    @paragraphs.setter
+    def paragraphs(self, paragraphs: List[str]):
+        if not paragraphs:
+            paragraphs = ['']
+        self._raw = ' '.join(paragraphs)
+        # The end of each paragraph is followed by the space, that was replaced by the paragraph break
+        self._ends = array('i', (end - 1 for end in itertools.accumulate(len(p) + 1 for p in paragraphs)))
+
+    @property
+    def text(self) -> str:
+        """
+        The text of the line without wrapping.
+        """
+        return self._raw
+
+    def _paragraph_start(self, paragraph_index: int) -> int:
+        """
+        Returns the line char index of the first character of the given paragraph.
+        """
+        return self._ends[paragraph_index - 1] + 1 if paragraph_index > 0 else 0
+
+    def _iter_starts(self) -> Iterable[int]:
+        yield 0
+        for end in self._ends[:-1]:
+            yield end + 1
+
+    def paragraph(self, paragraph_index: int) -> str:
+        """
+        Returns the text of the given paragraph.
+        """
+        return self._raw[self._paragraph_start(paragraph_index):self._ends[paragraph_index]]
+
+    def paragraph_length(self, paragraph_index: int) -> int:
+        """
+        Returns the number of characters of the given paragraph.
+        """
+        return self._ends[paragraph_index] - self._paragraph_start(paragraph_index)
+
     def get_line_char_index(self, paragraph_index: int, char_index: int) -> int:
         """
         Returns the character index, if all paragraphs would be in a single string.
         """
-        return sum(len(p) + 1 for p in self.paragraphs[:paragraph_index]) + char_index
+        return self._paragraph_start(paragraph_index) + char_index
 
-    def auto_wrap_and_norm_cursor(self, font: pg.font.Font, max_width: int, cursor: Cursor):
+    def invalidate_wrap(self):
+        """
+        Marks the line as changed, so it is wrapped again on the next call of TextField._wrap_text().
+        """
+        self._wrapped_width = None
+
+    def needs_wrap(self, max_width: int) -> bool:
+        """
+        Returns whether the line has to be wrapped again for the given max width.
+        """
+        return self._wrapped_width != max_width
+
+    def auto_wrap_and_norm_cursor(self, font: MeasuredFont, max_width: int, cursor: Cursor):
         """
         Wraps the line to fit within the given max width.
 
@@ -94,76 +161,83 @@ class Line:
         return new_cursor
 
     def get_paragraph_char_index(self, line_char_index: int) -> Tuple[int, int]:
-        cum_char_sum = 0
-        for i, p in enumerate(self.paragraphs):
-            p_chars = len(p) + 1  # every paragraph ends with a virtual extra character
-            if line_char_index < cum_char_sum + p_chars:
-                return i, line_char_index - cum_char_sum
-            cum_char_sum += p_chars  # TODO: +1?
-        return len(self.paragraphs) - 1, 0
+        """
+        Returns the paragraph index and the char index inside this paragraph for the given line char index.
+        """
+        if line_char_index > self.num_chars():
+            return len(self._ends) - 1, 0
+        # The end of a paragraph is a valid cursor position, so the first paragraph ending at or after the index is used
+        paragraph_index = bisect.bisect_left(self._ends, line_char_index)
+        return paragraph_index, line_char_index - self._paragraph_start(paragraph_index)
 
     def word_list(self) -> List[str]:
-        word_list = []
-        for p in self.paragraphs:
-            word_list.extend(p.split(' '))
-        return word_list
+        return self._raw.split(' ')
+
+    def auto_wrap(self, font: MeasuredFont, max_width: int):
+        # The widths are summed over the whole text at once, which keeps the per character work out of the python loop
+        char_widths = list(itertools.accumulate(font.char_advances(self._raw), initial=0.0))
+        if char_widths[-1] <= max_width:
+            # The whole line fits, so there is nothing to break
+            self._ends = array('i', (len(self._raw),))
+            self._wrapped_width = max_width
+            return
 
-    def auto_wrap(self, font: pg.font.Font, max_width: int):
         words = self.word_list()
-        current_line = ''
-        new_paragraphs = []
-
-        for word in words:
-            # Test if adding this word would exceed max width
-            test_line = current_line + (" " if current_line else "") + word
-            test_width = font.size(test_line)[0]
-
-            if test_width <= max_width:
-                # Word fits on current line
-                current_line = test_line
-            else:
-                # Word doesn't fit
-                if current_line:
-                    # Save current line and start new one
-                    new_paragraphs.append(current_line)
-                    current_line = word
-                else:
-                    # Single word is too long, force it on its own line
-                    new_paragraphs.append(word)
-                    current_line = ""
-
-        # Add the last line of this paragraph
-        if current_line:
-            new_paragraphs.append(current_line)
-
-        self.paragraphs = new_paragraphs
-        self.ensure_paragraph()
+        space_width = font.advance(' ')
+
+        # word_starts[k] is the line char index of the first character of word k
+        word_starts = list(itertools.accumulate((len(w) + 1 for w in words), initial=0))
+        # cum_widths[k] is the width of the first k words, each followed by a space
+        cum_widths = [char_widths[word_start] for word_start in word_starts[:-1]]
+        cum_widths.append(char_widths[-1] + space_width)
+
+        ends = array('i')
+        start = 0
+        while start < len(words):
+            # Find the last word, such that words[start:end] fits into max width. The trailing space is not counted.
+            end = bisect.bisect_right(cum_widths, cum_widths[start] + max_width + space_width, lo=start + 1) - 1
+            if end <= start:
+                # Single word is too long, force it on its own line
+                end = start + 1
+            ends.append(word_starts[end] - 1)
+            start = end
+
+        # The text itself does not change, only the paragraph breaks
+        self._ends = ends
+        self._wrapped_width = max_width
 
     def num_paragraphs(self) -> int:
-        return len(self.paragraphs)
+        return len(self._ends)
 
     def num_chars(self) -> int:
         """
         Returns the number of characters in the line. Each automatic wrap counts as one character.
         """
-        return sum(len(p) for p in self.paragraphs) + len(self.paragraphs) - 1
+        return len(self._raw)
 
     def split(self, paragraph_index: int, split_index: int) -> Tuple['Line', 'Line']:
         """
         Splits the current line at the given paragraph and character index. Returns the two resulting lines.
         """
-        left_paragraphs = self.paragraphs[:paragraph_index]
-        right_paragraphs = self.paragraphs[paragraph_index+1:]
-        middle_paragraph = self.paragraphs[paragraph_index]
-        left_part = ' ' + middle_paragraph[:split_index]
-        right_part = middle_paragraph[split_index:] + ' '
-        left_paragraphs.append(left_part)
-        right_paragraphs.insert(0, right_part)
-        return Line(''.join(left_paragraphs)), Line(''.join(right_paragraphs))
+        split_index = self.get_line_char_index(paragraph_index, split_index)
+        return Line(self._raw[:split_index]), Line(self._raw[split_index:])
 
-    @staticmethod
-    def _remove_from_paragraph(paragraph: str, start: int, end: int) -> str:
-        return paragraph[:start] + paragraph[end:]
+    def _shift_ends(self, paragraph_index: int, delta: int):
+        """
+        Moves the ends of the given paragraph and all following paragraphs by delta characters.
+        """
+        ends = self._ends
+        for i in range(paragraph_index, len(ends)):
+            ends[i] += delta
+
+    def insert_text(self, paragraph_index: int, char_index: int, text: str):
+        """
+        Inserts the given text into the given paragraph at the given char index.
+        """
+        index = self.get_line_char_index(paragraph_index, char_index)
+        self._raw = self._raw[:index] + text + self._raw[index:]
+        self._shift_ends(paragraph_index, len(text))
+        self.invalidate_wrap()
 
     def delete(self, start: CursorOrTuple, end: CursorOrTuple):
         if isinstance(start, tuple):
@@ -171,37 +245,22 @@ class Line:
         if isinstance(end, tuple):
             end = Cursor.from_tuple(*end)
 
-        if start.paragraph_index == end.paragraph_index:
-            p = self.paragraphs[start.paragraph_index]
-            self.paragraphs[start.paragraph_index] = p[:start.char_index] + p[end.char_index:]
-            self.ensure_paragraph()
-            return
-        before_start = self.paragraphs[:start.paragraph_index]
-        last_after_start = self.paragraphs[start.paragraph_index]
-        first_before_end = self.paragraphs[end.paragraph_index]
-        after_end = []
-        if end.paragraph_index+1 < len(self.paragraphs):
-            after_end = self.paragraphs[end.paragraph_index+1:]
-
-        new_paragraphs = before_start
-        middle_paragraph = last_after_start[:start.char_index] + first_before_end[end.char_index:]
-        if middle_paragraph:
-            new_paragraphs.append(middle_paragraph)
-        new_paragraphs.extend(after_end)
-        self.paragraphs = new_paragraphs
-        self.ensure_paragraph()
-
-    def ensure_paragraph(self):
-        if not self.paragraphs:
-            self.paragraphs = ['']
+        start_index = self.get_line_char_index(start.paragraph_index, start.char_index)
+        end_index = self.get_line_char_index(end.paragraph_index, end.char_index)
+        self._raw = self._raw[:start_index] + self._raw[end_index:]
+
+        # The paragraphs in between are removed, the remaining parts of the first and last paragraph are joined
+        del self._ends[start.paragraph_index:end.paragraph_index]
+        self._shift_ends(start.paragraph_index, start_index - end_index)
+        self.invalidate_wrap()
 
     def end(self) -> Tuple[int, int]:
-        paragraph_index = len(self.paragraphs) - 1
-        char_index = len(self.paragraphs[-1])
+        paragraph_index = len(self._ends) - 1
+        char_index = self.paragraph_length(paragraph_index)
         return paragraph_index, char_index
 
 
-class TextField(BaseElement):
+class TextField(CursorElement):
     def __init__(
             self, rect: pg.Rect, text: str = "", placeholder: str = "",
             bg_color: ColorType = (40, 40, 40), hover_color: ColorType = (50, 50, 50),
@@ -210,6 +269,8 @@ class TextField(BaseElement):
     ):
         super().__init__(rect)
         self.lines: List[Line] = []
+        self._line_starts: Optional[array] = None  # View line of the first paragraph of each line, built on demand
+        self._line_char_starts: Optional[array] = None  # Index of the first character of each line, built on demand
         self.placeholder = placeholder
 
         self.bg_color = bg_color
@@ -222,47 +283,92 @@ class TextField(BaseElement):
 
         self.cursor: Cursor = self.end_cursor()
         self.selection_start: Optional[Cursor] = None  # Start of text selection
-        self.is_focused: bool = False  # Whether the field is focused
         self.mouse_down: bool = False  # For tracking drag selection
         self.scroll_offset: int = 0  # Vertical scroll offset (in lines)
 
-        self.font = load_font()
-        self.line_height = self.font.get_height() if self.font else 20
+        self.font = MeasuredFont(load_font())
+        self.line_height = self.font.get_height()
+        self.atlas = GlyphAtlas(self.font)
+
+        # Sizes derived from rect, padding and line_height. They are recomputed, if one of them changes.
+        self._geometry_key: Optional[Tuple[int, ...]] = None
+        self._text_area = pg.Rect(0, 0, 0, 0)
+        self._inner_width = 0
+        self._visible_lines = 1
+        self._update_geometry()
 
         self.set_text(text)
 
     def set_text(self, text: str):
         self.lines = [Line(l) for l in text.split('\n')]
+        self._line_starts = None
+        self._line_char_starts = None
         self._wrap_text()
+        self.dirty = True
 
     def get_text(self) -> str:
-        paragraphs = []
-        for line in self.lines:
-            paragraphs.append(' '.join(p for p in line.paragraphs))
-        return '\n'.join(paragraphs)
+        return '\n'.join(line.text for line in self.lines)
 
     def end_cursor(self) -> Cursor:
         if not self.lines:
             return Cursor(0, 0, 0)
         line = self.lines[-1]
         line_index = len(self.lines) - 1
-        if not line.paragraphs:
-            return Cursor(line_index, 0, 0)
-        paragraph = line.paragraphs[-1]
-        paragraph_index = len(line.paragraphs)-1
-        return Cursor(line_index, paragraph_index, len(paragraph))
+        paragraph_index, char_index = line.end()
+        return Cursor(line_index, paragraph_index, char_index)
+
+    def _update_geometry(self):
+        """
+        Recompute the text area and the sizes derived from it, if rect, padding or line_height changed since the last
+        call. If the width of the text area changed, the text is wrapped again.
+        """
+        rect = self.rect
+        geometry_key = (rect.x, rect.y, rect.width, rect.height, self.padding, self.line_height)
+        if geometry_key == self._geometry_key:
+            return
+        self._geometry_key = geometry_key
+
+        inner_width = rect.width - 2 * self.padding
+        inner_height = rect.height - 2 * self.padding
+        self._text_area = pg.Rect(rect.left + self.padding, rect.top + self.padding, inner_width, inner_height)
+        self._visible_lines = max(1, int(inner_height / self.line_height))
+        if inner_width != self._inner_width:
+            self._inner_width = inner_width
+            self._wrap_text()
+            self._clamp_scroll()
 
     def _wrap_text(self):
         """
-        Wrap text to fit within max_width, breaking at word boundaries.
+        Wrap text to fit within max_width, breaking at word boundaries. Only lines, that changed since their last wrap
+        or were wrapped for a different width, are wrapped again.
         """
-        max_width = self.rect.width - 2 * self.padding
+        self._update_geometry()
+        max_width = self._inner_width
         for line_index, line in enumerate(self.lines):
+            if not line.needs_wrap(max_width):
+                continue
+            self._line_starts = None
             if line_index == self.cursor.line_index:
                 self.cursor = line.auto_wrap_and_norm_cursor(self.font, max_width, self.cursor)
             else:
                 line.auto_wrap(self.font, max_width)
 
+    def _wrap_line(self, line_index: int):
+        """
+        Wrap a single line after it was edited. If the number of its paragraphs changes, the view lines of the following
+        lines are shifted instead of being counted again.
+        """
+        self._update_geometry()
+        line = self.lines[line_index]
+        if not line.needs_wrap(self._inner_width):
+            return
+        old_num_paragraphs = line.num_paragraphs()
+        if line_index == self.cursor.line_index:
+            self.cursor = line.auto_wrap_and_norm_cursor(self.font, self._inner_width, self.cursor)
+        else:
+            line.auto_wrap(self.font, self._inner_width)
+        self._shift_line_starts(line_index + 1, line.num_paragraphs() - old_num_paragraphs)
+
     def _cursor_from_mouse_pos(self, mouse_pos: Tuple[int, int]) -> Optional[Cursor]:
         """Calculate the character index in text based on mouse position."""
         if not self.rect.collidepoint(*mouse_pos):
@@ -281,41 +387,74 @@ class TextField(BaseElement):
         line_index, paragraph_index = line_par
 
         line = self.lines[line_index]
-        paragraph = line.paragraphs[paragraph_index]
+        paragraph = line.paragraph(paragraph_index)
 
-        # Find which paragraph the click is in based on X position
-        for num_chars in range(len(paragraph) + 1):
-            text = paragraph[:num_chars]
-            paragraph_width = self.font.size(text)[0]
-            if paragraph_width > rel_x:
-                # TODO: num_chars + 1?
-                return Cursor(line_index, paragraph_index, num_chars)
+        # Find the first prefix of the paragraph, that is wider than the click position
+        prefix_widths = self.font.prefix_widths(paragraph)
+        num_chars = bisect.bisect_right(prefix_widths, rel_x)
 
-        # If click is past all paragraphs, return end of last paragraph
-        return Cursor(line_index, paragraph_index, len(paragraph))
+        # If click is past the end of the paragraph, return the end of the paragraph
+        return Cursor(line_index, paragraph_index, min(num_chars, len(paragraph)))
+
+    def _get_line_starts(self) -> array:
+        """
+        Returns the view line of the first paragraph of every line. The last entry is the number of all paragraphs.
+        The array is built again after lines were added, removed or wrapped.
+        """
+        if self._line_starts is None:
+            self._line_starts = array(
+                'i', itertools.accumulate((line.num_paragraphs() for line in self.lines), initial=0)
+            )
+        return self._line_starts
+
+    def _shift_line_starts(self, line_index: int, delta: int):
+        """
+        Moves the view lines of the given line and all following lines by delta paragraphs, if they are built already.
+        """
+        line_starts = self._line_starts
+        if line_starts is None or delta == 0:
+            return
+        for i in range(line_index, len(line_starts)):
+            line_starts[i] += delta
+
+    def _get_line_char_starts(self) -> array:
+        """
+        Returns the index of the first character of every line, if the whole text would be a single string. Every line
+        ends with a virtual newline character. The array is built again after the text changed.
+        """
+        if self._line_char_starts is None:
+            self._line_char_starts = array(
+                'i', itertools.accumulate((line.num_chars() + 1 for line in self.lines), initial=0)
+            )
+        return self._line_char_starts
+
+    def _cursor_from_flat_char_index(self, flat_char_index: int) -> Cursor:
+        """
+        Returns the cursor pointing to the character with the given index in the whole text.
+        """
+        line_char_starts = self._get_line_char_starts()
+        line_index = bisect.bisect_right(line_char_starts, flat_char_index) - 1
+        paragraph_index, char_index = self.lines[line_index].get_paragraph_char_index(
+            flat_char_index - line_char_starts[line_index]
+        )
+        return Cursor(line_index, paragraph_index, char_index)
 
     def _get_view_line_pos(self, cursor: Cursor) -> int:
-        view_line_pos = 0
-        for line in self.lines[:cursor.line_index]:
-            view_line_pos += line.num_paragraphs()
-        return view_line_pos + cursor.paragraph_index
+        return self._get_line_starts()[cursor.line_index] + cursor.paragraph_index
 
     def _get_num_paragraphs(self) -> int:
-        return sum(l.num_paragraphs() for l in self.lines)
+        return self._get_line_starts()[-1]
 
     def _get_line_and_paragraph_by_y(self, ypos: int) -> Optional[Tuple[int, int]]:
-        view_line_index = self.scroll_offset + ypos // self.line_height
-
-        start_line_index = 0
-        for line_index, line in enumerate(self.lines):
-            end_line_index = start_line_index + line.num_paragraphs()
-            if view_line_index < end_line_index:
-                paragraph_index = view_line_index - start_line_index
-                return line_index, paragraph_index
-            start_line_index = end_line_index
+        # Positions above the text (e.g. in the top padding) belong to the first visible paragraph
+        view_line_index = self.scroll_offset + max(0, ypos) // self.line_height
 
-        # out of region
-        return None
+        line_starts = self._get_line_starts()
+        if view_line_index >= line_starts[-1]:
+            # out of region
+            return None
+        line_index = bisect.bisect_right(line_starts, view_line_index) - 1
+        return line_index, view_line_index - line_starts[line_index]
 
     def handle_event(self, event: pg.event.Event):
         super().handle_event(event)
@@ -391,46 +530,57 @@ class TextField(BaseElement):
     def _get_line(self, cursor: Cursor) -> Line:
         return self.lines[cursor.line_index]
 
-    def _get_paragraph(self, cursor: Union[Cursor, Tuple[int, int]]) -> str:
-        if isinstance(cursor, Cursor):
-            return self._get_line(cursor).paragraphs[cursor.paragraph_index]
-        elif isinstance(cursor, tuple):
-            return self.lines[cursor[0]].paragraphs[cursor[1]]
-        else:
-            raise ValueError(f"Invalid cursor type: {type(cursor)}")
+    def _get_paragraph_by_cursor(self, cursor: Cursor) -> str:
+        return self.lines[cursor.line_index].paragraph(cursor.paragraph_index)
+
+    def _get_paragraph_by_indices(self, line_index: int, paragraph_index: int) -> str:
+        return self.lines[line_index].paragraph(paragraph_index)
 
     def _create_newline(self):
-        """Split a line into two."""
+        """Split a line into two. A selection is replaced by the line break."""
+        self._delete_selection()
+
         line_index = self.cursor.line_index
         orig_line = self.lines[line_index]
         left_line, right_line = orig_line.split(self.cursor.paragraph_index, self.cursor.char_index)
 
-        max_width = self.rect.width - 2 * self.padding
-        left_line.auto_wrap(self.font, max_width)
-        right_line.auto_wrap(self.font, max_width)
-
         self.lines[line_index] = left_line
         self.lines.insert(line_index + 1, right_line)
+        if self._line_starts is not None:
+            self._line_starts.insert(line_index + 1, self._line_starts[line_index] + left_line.num_paragraphs())
+            self._shift_line_starts(
+                line_index + 2,
+                left_line.num_paragraphs() + right_line.num_paragraphs() - orig_line.num_paragraphs()
+            )
+        self._line_char_starts = None
 
         self.cursor = Cursor(line_index + 1, 0, 0)
+        self.selection_start = None
+
+        # only the two new lines are wrapped
+        self._wrap_line(line_index)
+        self._wrap_line(line_index + 1)
 
     @staticmethod
-    def _next_char_index(paragraph: str, char_index: int, direction: int, jump_words: bool) -> int:
-        """Return the index of the next character in the given paragraph."""
+    def _next_char_index(text: str, char_index: int, direction: int, jump_words: bool) -> int:
+        """
+        Return the index of the next character in the given line text. Automatic wraps are part of the text, so word
+        jumps pass over them like over any other space.
+        """
         if not jump_words:
             return char_index + direction
 
         if direction > 0:
-            if char_index == len(paragraph):
-                return len(paragraph) + 1
-            new_index = paragraph.find(' ', char_index+1)
+            if char_index == len(text):
+                return len(text) + 1
+            new_index = text.find(' ', char_index+1)
             if new_index == -1:
-                return len(paragraph)
+                return len(text)
             return new_index
         elif direction < 0:
             if char_index == 0:
                 return -1
-            new_index = paragraph.rfind(' ', 0, char_index)
+            new_index = text.rfind(' ', 0, char_index)
             if new_index == -1:
                 return 0
             return new_index
@@ -448,39 +598,23 @@ class TextField(BaseElement):
         Modifies the given cursor moving in the given direction (-1 or 1).
         If jump_words is True, the cursor will jump over words.
         """
-        wrap_back = False
-        wrap_forward = False
-        new_line_index = cursor.line_index
-        new_paragraph_index = cursor.paragraph_index
-        new_char_index = TextField._next_char_index(
-            self._get_paragraph(cursor), cursor.char_index, direction, jump_words
-        )
-        if new_char_index < 0 or new_char_index > len(self._get_paragraph(cursor)):
-            wrap_back = new_char_index < 0
-            wrap_forward = new_char_index > len(self._get_paragraph(cursor))
-            new_paragraph_index = cursor.paragraph_index + direction
-            current_line = self._get_line(cursor)
-            if new_paragraph_index < 0 or new_paragraph_index >= current_line.num_paragraphs():
-                new_line_index = cursor.line_index + direction
-                if new_line_index < 0 or new_line_index >= len(self.lines):
-                    return
-                if new_paragraph_index < 0:
-                    new_paragraph_index = self.lines[new_line_index].num_paragraphs() - 1
-                elif new_paragraph_index >= current_line.num_paragraphs():
-                    new_paragraph_index = 0
-        if wrap_forward:
-            new_char_index = 0
-        if wrap_back:
-            new_char_index = len(self._get_paragraph((new_line_index, new_paragraph_index)))
+        line = self._get_line(cursor)
+        line_char_index = line.get_line_char_index(cursor.paragraph_index, cursor.char_index)
+        new_line_char_index = TextField._next_char_index(line.text, line_char_index, direction, jump_words)
+        # Moving past the start or end of a line continues in the previous or next line
+        flat_index = self._get_line_char_starts()[cursor.line_index] + new_line_char_index
+        if flat_index < 0 or flat_index >= self._get_line_char_starts()[-1]:
+            return
+        new_cursor = self._cursor_from_flat_char_index(flat_index)
 
-        cursor.line_index = new_line_index
-        cursor.paragraph_index = new_paragraph_index
-        cursor.char_index = new_char_index
+        cursor.line_index = new_cursor.line_index
+        cursor.paragraph_index = new_cursor.paragraph_index
+        cursor.char_index = new_cursor.char_index
 
     def _update_scroll(self):
         """Update scroll offset to keep cursor visible."""
-        visible_height = self.rect.height - 2 * self.padding
-        visible_lines = max(1, int(visible_height / self.line_height))
+        self._update_geometry()
+        visible_lines = self._visible_lines
 
         cursor_line = self._get_view_line_pos(self.cursor)
 
@@ -496,10 +630,8 @@ class TextField(BaseElement):
 
     def _clamp_scroll(self):
         """Ensure scroll offset is within valid bounds."""
-        visible_height = self.rect.height - 2 * self.padding
-        visible_lines = max(1, int(visible_height / self.line_height))
-
-        max_scroll = max(0, self._get_num_paragraphs() - visible_lines)
+        self._update_geometry()
+        max_scroll = max(0, self._get_num_paragraphs() - self._visible_lines)
         self.scroll_offset = max(0, min(self.scroll_offset, max_scroll))
 
     def _insert_text(self, char: str):
@@ -507,16 +639,14 @@ class TextField(BaseElement):
         self._delete_selection()
 
         # insert text
-        paragraph = self._get_paragraph(self.cursor)
-        paragraph = paragraph[:self.cursor.char_index] + char + paragraph[self.cursor.char_index:]
         line = self.lines[self.cursor.line_index]
-        line.paragraphs[self.cursor.paragraph_index] = paragraph
+        line.insert_text(self.cursor.paragraph_index, self.cursor.char_index, char)
+        self._line_char_starts = None
+        self.cursor.char_index += len(char)
 
-        # wrap line
-        self._wrap_text()
+        # wrap line, the cursor is moved along, if the text after it is wrapped into the next paragraph
+        self._wrap_line(self.cursor.line_index)
 
-        # handle cursor
-        self.cursor.char_index += len(char)
         self.selection_start = None
         self._update_scroll()
 
@@ -540,7 +670,7 @@ class TextField(BaseElement):
             elif new_line_index >= len(self.lines):
                 new_line_index = len(self.lines) - 1
                 new_paragraph_index = self.lines[new_line_index].num_paragraphs() - 1
-                new_char_index = len(self._get_paragraph((new_line_index, new_paragraph_index)))
+                new_char_index = len(self._get_paragraph_by_indices(new_line_index, new_paragraph_index))
             else:
                 if new_paragraph_index < 0:
                     new_paragraph_index = self.lines[new_line_index].num_paragraphs() - 1
@@ -579,7 +709,7 @@ class TextField(BaseElement):
             self.cursor = self.end_cursor()
         else:
             # Move to end of current wrapped line
-            self.cursor.char_index = len(self._get_paragraph(self.cursor))
+            self.cursor.char_index = len(self._get_paragraph_by_cursor(self.cursor))
 
         self._update_scroll()
 
@@ -589,12 +719,12 @@ class TextField(BaseElement):
         if new_cursor.line_index >= len(self.lines):
             new_cursor.line_index = len(self.lines) - 1
             new_cursor.paragraph_index = max(0, self.lines[new_cursor.line_index].num_paragraphs() - 1)
-            new_cursor.char_index = len(self._get_paragraph(new_cursor))
+            new_cursor.char_index = len(self._get_paragraph_by_cursor(new_cursor))
         elif new_cursor.paragraph_index >= self.lines[new_cursor.line_index].num_paragraphs():
             new_cursor.paragraph_index = self.lines[new_cursor.line_index].num_paragraphs() - 1
-            new_cursor.char_index = len(self._get_paragraph(new_cursor))
-        elif new_cursor.char_index > len(self._get_paragraph(new_cursor)):
-            new_cursor.char_index = len(self._get_paragraph(new_cursor))
+            new_cursor.char_index = len(self._get_paragraph_by_cursor(new_cursor))
+        elif new_cursor.char_index > len(self._get_paragraph_by_cursor(new_cursor)):
+            new_cursor.char_index = len(self._get_paragraph_by_cursor(new_cursor))
 
         return new_cursor
 
@@ -606,7 +736,6 @@ class TextField(BaseElement):
             target_cursor = self.cursor.copy()
             self._move_cursor(target_cursor, direction, jump_words)
             self._delete(self.cursor, target_cursor)
-            self.cursor = min(target_cursor, self.cursor)
 
     def _get_selection_range(self) -> Tuple[Cursor, Cursor]:
         """Get the start and end of the current selection (ordered)."""
@@ -619,21 +748,21 @@ class TextField(BaseElement):
         start, end = self._get_selection_range()
         if start != end:
             self._delete(start, end)
-            self.cursor = start
             self.selection_start = None
             return True
         return False
 
     def _delete(self, start: Cursor, end: Cursor):
-        """Delete text between both cursors."""
+        """Delete text between both cursors. The cursor is placed at the start of the deleted text."""
         if end < start:
             start, end = end, start
-        max_width = self.rect.width - 2 * self.padding
+        self._update_geometry()
+        max_width = self._inner_width
 
         if start.line_index == end.line_index:
             line = self._get_line(start)
             line.delete(start, end)
-            line.auto_wrap(self.font, max_width)
+            start = line.auto_wrap_and_norm_cursor(self.font, max_width, start)
         else:
             new_lines = self.lines[:start.line_index].copy()
 
@@ -643,13 +772,17 @@ class TextField(BaseElement):
             first_end_line = self.lines[end.line_index]
             first_end_line.delete((0, 0), end)
 
-            middle_line = Line(last_start_line.paragraphs + first_end_line.paragraphs)
-            middle_line.ensure_paragraph()
-            middle_line.auto_wrap(self.font, max_width)
+            middle_line = Line(last_start_line.text + first_end_line.text)
+            start_char_index = last_start_line.get_line_char_index(start.paragraph_index, start.char_index)
+            start = middle_line.auto_wrap_and_norm_cursor(
+                self.font, max_width, Cursor(start.line_index, 0, start_char_index)
+            )
             new_lines.append(middle_line)
 
             new_lines.extend(self.lines[end.line_index + 1:])
             self.lines = new_lines
+        self._line_starts = None
+        self._line_char_starts = None
         self.cursor = self._clamp_cursor(start)
 
     def _select_all(self):
@@ -714,36 +847,55 @@ class TextField(BaseElement):
         pg.draw.rect(screen, self.border_color, self.rect, border_width)
 
         # Text rendering area with padding
-        text_area = pg.Rect(
-            self.rect.left + self.padding,
-            self.rect.top + self.padding,
-            self.rect.width - 2 * self.padding,
-            self.rect.height - 2 * self.padding
-        )
+        self._update_geometry()
+        text_area = self._text_area
 
         # Set clipping region
         clip_rect = screen.get_clip()
         screen.set_clip(text_area)
 
         # Draw text or placeholder
-        y_pos = text_area.top + self.padding
+        cursor_visible = self.is_focused and cursor_blink_on()
+        self._cursor_shown = cursor_visible
+        cursor_line_index, cursor_paragraph_index = self.cursor.line_index, self.cursor.paragraph_index
         selection_start, selection_end = self._get_selection_range()
-        for line_index, line in enumerate(self.lines):
-            for paragraph_index, paragraph in enumerate(line.paragraphs):
-                self._draw_selection(
-                    line_index, paragraph, paragraph_index, screen, selection_end, selection_start, text_area, y_pos
-                )
-
-                text_surface = self.font.render(paragraph, True, self.text_color)
-                screen.blit(text_surface, (text_area.left, y_pos))
+        for line_index, paragraph_index, paragraph, y_pos in self._iter_visible_paragraphs(text_area):
+            self._draw_selection(
+                line_index, paragraph, paragraph_index, screen, selection_end, selection_start, text_area, y_pos
+            )
 
-                self.draw_cursor(screen, line_index, paragraph, paragraph_index, y_pos, text_area)
+            self.atlas.draw(screen, paragraph, self.text_color, (text_area.left, y_pos))
 
-                y_pos += self.line_height
+            if cursor_visible and line_index == cursor_line_index and paragraph_index == cursor_paragraph_index:
+                self.draw_cursor(screen, paragraph, y_pos, text_area)
 
         # Restore clip rect
         screen.set_clip(clip_rect)
 
+    def _iter_visible_paragraphs(self, text_area: pg.Rect) -> Iterator[Tuple[int, int, str, int]]:
+        """
+        Iterate over the paragraphs, that are visible in the given text area with the current scroll offset. Paragraphs
+        above or below the text area are skipped without being looked at.
+
+        :param text_area: The area the text is drawn in.
+        :return: Tuples of (line_index, paragraph_index, paragraph, y_pos).
+        """
+        line_starts = self._get_line_starts()
+        first_line_index = bisect.bisect_right(line_starts, self.scroll_offset) - 1
+        if first_line_index >= len(self.lines):
+            return
+        first_paragraph_index = self.scroll_offset - line_starts[first_line_index]
+
+        y_pos = text_area.top + self.padding
+        for line_index in range(first_line_index, len(self.lines)):
+            line = self.lines[line_index]
+            for paragraph_index in range(first_paragraph_index, line.num_paragraphs()):
+                if y_pos >= text_area.bottom:
+                    return
+                yield line_index, paragraph_index, line.paragraph(paragraph_index), y_pos
+                y_pos += self.line_height
+            first_paragraph_index = 0
+
     def _draw_selection(
             self, line_index: int, paragraph: str, paragraph_index: int, screen: pg.Surface, selection_end: Cursor,
             selection_start: Cursor, text_area: pg.Rect, y_pos: int
@@ -764,18 +916,19 @@ class TextField(BaseElement):
         if selection_end.line_index == line_index and selection_end.paragraph_index == paragraph_index:
             end_char_index = selection_end.char_index
 
-        highlight_offset = self.font.size(paragraph[:start_char_index])[0]
-        highlight_width = self.font.size(paragraph[start_char_index:end_char_index])[0]
+        # Round both edges the same way the glyph atlas places glyphs, so the highlight lines up with the text
+        prefix_widths = self.font.prefix_widths(paragraph)
+        highlight_left = round(text_area.left + prefix_widths[start_char_index])
+        highlight_right = round(text_area.left + prefix_widths[end_char_index])
         selection_rect = pg.Rect(
-            text_area.left + highlight_offset, y_pos,
-            highlight_width, self.line_height
+            highlight_left, y_pos,
+            highlight_right - highlight_left, self.line_height
         )
         pg.draw.rect(screen, (100, 150, 200), selection_rect)
 
-    def draw_cursor(self, screen: pg.Surface, line_index: int, paragraph: str, paragraph_index: int, y_pos: int, text_area: pg.Rect):
-        if self.is_focused:
-            cursor_visible = (pg.time.get_ticks() // 500) % 2 == 0
-            if cursor_visible:
-                if self.cursor.line_index == line_index and self.cursor.paragraph_index == paragraph_index:
-                    x_pos = text_area.left + self.font.size(paragraph[:self.cursor.char_index])[0]
-                    pg.draw.line(screen, self.text_color, (x_pos, y_pos), (x_pos, y_pos + self.line_height), 2)
+    def draw_cursor(self, screen: pg.Surface, paragraph: str, y_pos: int, text_area: pg.Rect):
+        """
+        Draw the cursor into the given paragraph, which has to be the paragraph the cursor points to.
+        """
+        x_pos = round(text_area.left + self.font.prefix_widths(paragraph)[self.cursor.char_index])
+        pg.draw.line(screen, self.text_color, (x_pos, y_pos), (x_pos, y_pos + self.line_height), 2)
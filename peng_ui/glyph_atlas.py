@@ -0,0 +1,116 @@
+from typing import Dict, List, Tuple
+
+import pygame as pg
+
+from peng_ui.utils import ColorType, MeasuredFont, TextRenderer, to_display_format
+
+FIRST_GLYPH = 32
+LAST_GLYPH = 126
+WHITE = (255, 255, 255)
+
+
+class GlyphAtlas:
+    """
+    Pre-rendered glyphs of a font packed into a single sheet surface. Text is drawn by blitting the glyphs one by one,
+    so changing text does not need to be rendered with the font again.
+
+    The printable ASCII characters are rendered once on creation. Other characters are rendered on first use. If the
+    font is a MeasuredFont, the atlas shares its advances, so every character is measured only once.
+    """
+    def __init__(self, font: TextRenderer, max_sheet_width: int = 512):
+        self.font = font
+        self.height: int = font.get_height()
+        measured_font = font if isinstance(font, MeasuredFont) else MeasuredFont(font)
+        self.advances: Dict[str, float] = measured_font.advances
+        self.advance = measured_font.advance  # Returns the horizontal advance of a character in (sub-)pixels
+        self.rects: Dict[str, pg.Rect] = {}
+
+        glyphs: List[Tuple[str, pg.Surface]] = []
+        for code in range(FIRST_GLYPH, LAST_GLYPH + 1):
+            char = chr(code)
+            glyph = font.render(char, True, WHITE)
+            glyphs.append((char, glyph))
+            self.advance(char)
+        self.sheet: pg.Surface = self._pack(glyphs, max_sheet_width)
+
+        self._tinted_sheets: Dict[ColorType, pg.Surface] = {}
+        self._extra_glyphs: Dict[Tuple[str, ColorType], pg.Surface] = {}
+
+    def _pack(self, glyphs: List[Tuple[str, pg.Surface]], max_sheet_width: int) -> pg.Surface:
+        """
+        Pack the given glyphs into rows of a single surface. All glyphs of a font have the same height, so a skyline
+        packer boils down to filling one row after another.
+        """
+        x, y = 0, 0
+        sheet_width = 0
+        for char, glyph in glyphs:
+            width = glyph.get_width()
+            if x + width > max_sheet_width and x > 0:
+                x = 0
+                y += self.height
+            self.rects[char] = pg.Rect(x, y, width, self.height)
+            x += width
+            sheet_width = max(sheet_width, x)
+
+        sheet = pg.Surface((max(sheet_width, 1), y + self.height), pg.SRCALPHA)
+        for char, glyph in glyphs:
+            sheet.blit(glyph, self.rects[char])
+        return to_display_format(sheet)
+
+    def _get_sheet(self, color: ColorType) -> pg.Surface:
+        """Returns the glyph sheet tinted in the given color."""
+        sheet = self._tinted_sheets.get(color)
+        if sheet is None:
+            sheet = self.sheet.copy()
+            sheet.fill(color, special_flags=pg.BLEND_RGBA_MULT)
+            self._tinted_sheets[color] = sheet
+        return sheet
+
+    def _get_extra_glyph(self, char: str, color: ColorType) -> pg.Surface:
+        """Returns a glyph, that is not part of the sheet, rendering it on first use."""
+        glyph = self._extra_glyphs.get((char, color))
+        if glyph is None:
+            glyph = to_display_format(self.font.render(char, True, color))
+            self._extra_glyphs[(char, color)] = glyph
+        return glyph
+
+    def text_width(self, text: str) -> int:
+        """Returns the width of the given text, if drawn with this atlas."""
+        advances = self.advances
+        width = 0.0
+        for char in text:
+            advance = advances.get(char)
+            width += self.advance(char) if advance is None else advance
+        return round(width)
+
+    def draw(
+            self, surface: pg.Surface, text: str, color: ColorType, pos: Tuple[int, int], anchor: str = 'topleft'
+    ) -> pg.Rect:
+        """
+        Draw the given text onto the surface by blitting the glyphs of the atlas.
+
+        :param surface: The surface to draw on.
+        :param text: The text to draw.
+        :param color: The color of the text.
+        :param pos: The position of the text. It is rounded to whole pixels.
+        :param anchor: The rect attribute, that is placed at the given position (e.g. "topleft", "center", "midleft").
+        :return: The rect the text was drawn to.
+        """
+        if not isinstance(color, tuple):
+            color = tuple(color)  # pg.Color is not hashable
+        rect = pg.Rect(0, 0, self.text_width(text), self.height)
+        setattr(rect, anchor, (round(pos[0]), round(pos[1])))
+
+        sheet = self._get_sheet(color)
+        rects = self.rects
+        x, y = rect.topleft
+        blit_sequence = []
+        for char in text:
+            area = rects.get(char)
+            if area is not None:
+                blit_sequence.append((sheet, (round(x), y), area))
+            else:
+                blit_sequence.append((self._get_extra_glyph(char, color), (round(x), y)))
+            x += self.advance(char)
+        surface.blits(blit_sequence, doreturn=False)
+        return rect
@@ -1,20 +1,142 @@
 import enum
+import functools
+import itertools
+import os
 import warnings
-from typing import Union, Tuple
+from dataclasses import dataclass
+from typing import Dict, Iterator, Union, Tuple, Protocol
 
 import pygame as pg
+import pygame.freetype
 
 
 ColorType = Union[Tuple[int, int, int], pg.Color]
+CURSOR_BLINK_INTERVAL = 500  # Milliseconds between toggling the text cursor
+FONT_SIZE = 36
+MEASURE_CACHE_SIZE = 4096  # Number of texts, whose prefix widths are remembered by a MeasuredFont
+# The font positions glyphs with sub-pixel precision, so advances are measured over a run of the same character
+ADVANCE_SAMPLES = 32
+DEFAULT_FONT_SCALE = 0.6875  # pg.font.Font scales the size of the default font by this factor
 
 
-class RenderContext:
-    def __init__(self, font: pg.font.Font):
+class TextRenderer(Protocol):
+    """
+    The interface used to measure and render text. pg.font.Font implements it directly. Other backends can be used by
+    implementing these methods.
+    """
+    def render(self, text: str, antialias: bool, color: ColorType) -> pg.Surface:
+        ...
+
+    def size(self, text: str) -> Tuple[int, int]:
+        ...
+
+    def get_height(self) -> int:
+        ...
+
+
+class FreetypeTextRenderer:
+    """
+    Renders text with the pygame.freetype module, which uses FreeType directly instead of SDL_ttf.
+    Line height and advances differ from pg.font.Font at the same size, so the layout of text changes with the backend.
+    """
+    def __init__(self, size: int):
+        pygame.freetype.init()
+        self._font = pygame.freetype.Font(None, size * DEFAULT_FONT_SCALE)
+        self._font.pad = True  # Measure and render the whole line height, not only the inked area of the text
+
+    def render(self, text: str, antialias: bool, color: ColorType) -> pg.Surface:
+        self._font.antialiased = antialias
+        surface, _rect = self._font.render(text, color)
+        return surface
+
+    def size(self, text: str) -> Tuple[int, int]:
+        return self._font.get_rect(text).width, self.get_height()
+
+    def get_height(self) -> int:
+        return self._font.get_sized_height()
+
+
+class NullTextRenderer:
+    """
+    Stand-in, if no font could be loaded. Text is measured with zero width and rendered as empty surfaces, so the
+    elements do not need to check for a missing font on every frame.
+    """
+    def __init__(self, height: int = 20):
+        self._height = height
+
+    def render(self, _text: str, _antialias: bool, _color: ColorType) -> pg.Surface:
+        return pg.Surface((0, self._height), pg.SRCALPHA)
+
+    def size(self, _text: str) -> Tuple[int, int]:
+        return 0, self._height
+
+    def get_height(self) -> int:
+        return self._height
+
+
+def measure_advance(font: TextRenderer, char: str) -> float:
+    """
+    Returns the horizontal advance of the given character in (sub-)pixels.
+    """
+    return font.size(char * ADVANCE_SAMPLES)[0] / ADVANCE_SAMPLES
+
+
+class MeasuredFont:
+    """
+    Wraps a TextRenderer and measures the advance of every character once, so the widths of all prefixes of a text can
+    be summed up without asking the font again. Text layout measures the same paragraphs over and over, so their prefix
+    widths are remembered as well.
+    """
+    def __init__(self, font: TextRenderer, maxsize: int = MEASURE_CACHE_SIZE):
         self.font = font
-        self.mouse_pressed = False
+        self.advances: Dict[str, float] = {}
+        self.prefix_widths = functools.lru_cache(maxsize=maxsize)(self._prefix_widths)
+
+    def advance(self, char: str) -> float:
+        """Returns the horizontal advance of the given character in (sub-)pixels."""
+        advance = self.advances.get(char)
+        if advance is None:
+            advance = measure_advance(self.font, char)
+            self.advances[char] = advance
+        return advance
+
+    def char_advances(self, text: str) -> Iterator[float]:
+        """
+        Returns the advances of all characters of the given text. Unknown characters are measured up front, so the
+        lookups themselves do not run any python code per character.
+        """
+        advances = self.advances
+        for char in set(text).difference(advances):
+            self.advance(char)
+        return map(advances.__getitem__, text)
+
+    def _prefix_widths(self, text: str) -> Tuple[float, ...]:
+        """
+        Returns the widths of all prefixes of the given text. The i-th entry is the width of text[:i], so the result has
+        len(text) + 1 entries.
+        """
+        return tuple(itertools.accumulate(self.char_advances(text), initial=0.0))
+
+    def render(self, text: str, antialias: bool, color: ColorType) -> pg.Surface:
+        return self.font.render(text, antialias, color)
+
+    def size(self, text: str) -> Tuple[int, int]:
+        return self.font.size(text)
+
+    def get_height(self) -> int:
+        return self.font.get_height()
+
+    def __getattr__(self, name):
+        return getattr(self.font, name)
+
+
+@dataclass(slots=True, eq=False)
+class RenderContext:
+    font: TextRenderer
+    mouse_pressed: bool = False
 
     @staticmethod
-    def default():
+    def default() -> 'RenderContext':
         font = load_font()
         return RenderContext(font)
 
@@ -43,18 +165,65 @@ class Align(enum.StrEnum):
         return new_rect
 
 
-def load_font():
+def load_font() -> TextRenderer:
     """
     Helper function to load the default font.
-    :return: The font to use
+    The text backend can be selected with the environment variable PENG_UI_TEXT_BACKEND. Possible values are "font"
+    (pygame.font, the default) and "freetype" (pygame.freetype).
+
+    :return: The font to use. If no font could be loaded, a NullTextRenderer is returned.
     """
+    backend = os.environ.get('PENG_UI_TEXT_BACKEND', 'font')
     try:
-        font = pg.font.Font(None, 36)
+        if backend == 'font':
+            font = pg.font.Font(None, FONT_SIZE)
+        elif backend == 'freetype':
+            font = FreetypeTextRenderer(FONT_SIZE)
+        else:
+            raise ValueError(f"Invalid text backend: {backend}")
     except pg.error:
         warnings.warn("Warning: Could not load default font. Text will not be rendered.")
-        font = None
+        font = NullTextRenderer()
     return font
 
 
+def blit_text(
+        surface: pg.Surface, text_surface: pg.Surface, pos: Tuple[int, int], anchor: str = 'topleft'
+) -> pg.Rect:
+    """
+    Draw an already rendered text surface onto the surface.
+
+    :param surface: The surface to draw on.
+    :param text_surface: The rendered text.
+    :param pos: The position of the text. It is rounded to whole pixels.
+    :param anchor: The rect attribute, that is placed at the given position (e.g. "topleft", "center", "midleft").
+    :return: The rect the text was drawn to.
+    """
+    # Snap to whole pixels, so fractional positions (e.g. from scaling) always place the surface the same way
+    rect = text_surface.get_rect(**{anchor: (round(pos[0]), round(pos[1]))})
+    surface.blit(text_surface, rect)
+    return rect
+
+
+def to_display_format(surface: pg.Surface) -> pg.Surface:
+    """
+    Convert the surface to the pixel format of the display, so blitting it later does not convert every pixel again.
+    Surfaces created before the display mode is set are returned unchanged.
+
+    :param surface: A surface with per pixel alpha (e.g. rendered text).
+    :return: The converted surface.
+    """
+    if pg.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha()
+
+
+def cursor_blink_on() -> bool:
+    """
+    Returns whether a blinking text cursor is currently shown.
+    """
+    return (pg.time.get_ticks() // CURSOR_BLINK_INTERVAL) % 2 == 0
+
+
 def clamp(n, minn, maxn):
     return max(min(maxn, n), minn)
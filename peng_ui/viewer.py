@@ -1,27 +1,92 @@
-from typing import Tuple, Optional, List, Union, Iterable
+import os
+from typing import Tuple, Optional, List, Union, Iterable, Dict, Callable
 
 import pygame as pg
 
 from peng_ui.elements.base_element import BaseElement
-from peng_ui.container import Container
+from peng_ui.container import Container, EventDispatcher
 from peng_ui.utils import RenderContext
 
+VSYNC_DISPLAY_FLAGS = pg.DOUBLEBUF | pg.SCALED  # vsync needs the hardware accelerated renderer
 
-class Viewer:
-    def __init__(self, title: str = "Window", screen_size: Tuple[int, int] = (800, 600), flags: int = 0):
+
+def _vsync_from_env() -> bool:
+    """
+    Returns whether vsync should be used. Set the environment variable PENG_UI_VSYNC=1 to enable vsync without changing
+    the code.
+    """
+    return os.environ.get('PENG_UI_VSYNC', '0').lower() in ('1', 'true', 'yes', 'on')
+
+
+class Viewer(EventDispatcher):
+    def __init__(
+            self, title: str = "Window", screen_size: Tuple[int, int] = (800, 600),
+            flags: int = 0, vsync: Optional[bool] = None, coalesce_mouse_motion: bool = True,
+            partial_repaint: bool = False
+    ):
+        """
+        :param title: The window title.
+        :param screen_size: The size of the window.
+        :param flags: The flags passed to pg.display.set_mode().
+        :param vsync: Whether to wait for vsync when flipping the display. This adds DOUBLEBUF | SCALED to the flags, as
+            vsync needs the hardware accelerated renderer. Defaults to the PENG_UI_VSYNC environment variable (disabled
+            if unset).
+        :param coalesce_mouse_motion: If True, MOUSEMOTION events are blocked and the mouse position is sampled once per
+            frame instead. Elements then receive at most one MOUSEMOTION event per frame.
+        :param partial_repaint: If True, only the areas covered by elements are cleared and updated on the display.
+            This requires, that all elements draw inside their rect and that nothing else is drawn onto the screen.
+            Otherwise, the whole screen is drawn again in every frame.
+        """
+        super().__init__()
         pg.init()
-        self.screen = pg.display.set_mode(screen_size, flags)
+        if vsync is None:
+            vsync = _vsync_from_env()
+        self.vsync = vsync
+        if vsync:
+            try:
+                self.screen = pg.display.set_mode(screen_size, flags | VSYNC_DISPLAY_FLAGS, vsync=1)
+            except pg.error:
+                # vsync is not available on this platform, fall back to the flags of the caller
+                self.vsync = False
+        if not self.vsync:
+            self.screen = pg.display.set_mode(screen_size, flags)
         pg.scrap.init()
         pg.display.set_caption(title)
         self.running = True
+        self.dirty = True  # Whether the screen has to be drawn again
+        self.idle_timeout = 16  # Milliseconds to wait for new events, if nothing has to be drawn
+        self.coalesce_mouse_motion = coalesce_mouse_motion
+        self._mouse_pos: Optional[Tuple[int, int]] = None  # The last sampled mouse position
+        if coalesce_mouse_motion:
+            pg.event.set_blocked(pg.MOUSEMOTION)
+        self.partial_repaint = partial_repaint
+        self.full_redraw = True  # Whether the next frame updates the whole screen instead of the element rects only
+        self._drawn_rects: List[pg.Rect] = []  # Rects of the elements drawn in the last frame
         self.render_context = RenderContext.default()
         self._element_cache: Optional[List[Union[Container, BaseElement]]] = None
+        # Event types handled by the viewer itself. All other events are forwarded to the elements.
+        self._event_handlers: Dict[int, Callable[[pg.event.Event], None]] = {
+            pg.QUIT: self._on_quit,
+            pg.VIDEOEXPOSE: self._on_expose,
+            pg.WINDOWEXPOSED: self._on_expose,
+        }
 
     def run(self):
+        # Events are polled right after the previous flip returned and before the next frame is drawn. This way input
+        # that arrives while waiting for vsync is shown in the very next frame. The initial flip puts the loop into
+        # this post-flip state from the start.
+        pg.display.flip()
+
+        # Resolve the methods once instead of on every iteration
+        handle_events = self.handle_events
+        tick = self.tick
+        needs_redraw = self.needs_redraw
+        render = self.render
         while self.running:
-            self.handle_events()
-            self.tick()
-            self.render()
+            handle_events()
+            tick()
+            if self.dirty or needs_redraw():
+                render()
 
         pg.quit()
 
@@ -35,19 +100,95 @@ class Viewer:
 
         yield from self._element_cache
 
+    def needs_redraw(self) -> bool:
+        """
+        Whether an element changed without an event and the screen has to be drawn again.
+        """
+        return any(elem.needs_redraw() for elem in self.iter_elements())
+
     def handle_events(self):
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                self.running = False
+        event_get = pg.event.get
+        events = event_get()
+        if not events and not self.dirty:
+            # Nothing to draw, so block until something happens instead of busy looping
+            event = pg.event.wait(self.idle_timeout)
+            if event.type != pg.NOEVENT:
+                events.append(event)
+                events.extend(event_get())
+        if self.coalesce_mouse_motion:
+            motion_event = self._sample_mouse_motion()
+            if motion_event is not None:
+                # Dispatch the motion first, so elements are hovered, when they receive button events of this frame
+                events.insert(0, motion_event)
+        if not events:
+            return
+        self.dirty = True
+
+        handlers = self._event_handlers
+        default_handler = self._dispatch_to_elements
+        for event in events:
+            handlers.get(event.type, default_handler)(event)
+            if not self.running:
                 break
-            for elem in self.iter_elements():
-                elem.handle_event(event)
+
+    def _sample_mouse_motion(self) -> Optional[pg.event.Event]:
+        """
+        Returns a MOUSEMOTION event, if the mouse moved since the last call.
+        """
+        if not pg.mouse.get_focused():
+            return None
+        pos = pg.mouse.get_pos()
+        if pos == self._mouse_pos:
+            return None
+        last_pos = pos if self._mouse_pos is None else self._mouse_pos
+        self._mouse_pos = pos
+        return pg.event.Event(
+            pg.MOUSEMOTION, pos=pos, rel=(pos[0] - last_pos[0], pos[1] - last_pos[1]),
+            buttons=pg.mouse.get_pressed(), touch=False
+        )
+
+    def _on_quit(self, _event: pg.event.Event):
+        self.running = False
+
+    def _on_expose(self, event: pg.event.Event):
+        # The window content has to be presented again as a whole
+        self.full_redraw = True
+        self._dispatch_to_elements(event)
 
     def tick(self):
         pass
 
+    def _element_rects(self) -> List[pg.Rect]:
+        """
+        Returns copies of the rects of all visible elements, including the elements inside containers.
+        """
+        rects = []
+        for elem in self.iter_elements():
+            children = elem.iter_elements() if isinstance(elem, Container) else (elem,)
+            rects.extend(child.rect.copy() for child in children if child.visible)
+        return rects
+
     def render(self):
-        self.screen.fill(0)
+        """
+        Draw all elements. With partial_repaint, only the areas covered by elements in this or the previous frame are
+        cleared and updated on the display, unless full_redraw is set.
+        """
+        full_redraw = self.full_redraw or not self.partial_repaint
+        rects = self._element_rects() if self.partial_repaint else []
+        if full_redraw:
+            self.screen.fill(0)
+        else:
+            dirty_rects = self._drawn_rects + rects
+            for rect in dirty_rects:
+                self.screen.fill(0, rect)
+
         for elem in self.iter_elements():
             elem.render(self.screen, self.render_context)
-        pg.display.flip()
+
+        if full_redraw:
+            pg.display.flip()
+            self.full_redraw = False
+        else:
+            pg.display.update(dirty_rects)
+        self._drawn_rects = rects
+        self.dirty = False
@@ -0,0 +1,172 @@
+import itertools
+import os
+import random
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame as pg
+import pytest
+
+from peng_ui.elements.text_field import Cursor, Line, TextField
+from peng_ui.utils import MeasuredFont, load_font
+
+WORD_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,!?'
+
+
+@pytest.fixture(scope='module', autouse=True)
+def display():
+    pg.init()
+    pg.display.set_mode((100, 100))
+    yield
+    pg.quit()
+
+
+@pytest.fixture(scope='module')
+def font() -> MeasuredFont:
+    return MeasuredFont(load_font())
+
+
+def random_text(rng: random.Random, num_words: int) -> str:
+    # Empty words produce consecutive spaces, which have to survive wrapping as well
+    words = [''.join(rng.choice(WORD_CHARS) for _ in range(rng.randint(0, 12))) for _ in range(num_words)]
+    return ' '.join(words)
+
+
+def greedy_wrap(font: MeasuredFont, text: str, max_width: int):
+    """
+    Reference implementation of the wrap: Add words to the current paragraph, as long as it fits into max_width.
+    """
+    paragraphs = []
+    current = None
+    for word in text.split(' '):
+        if current is None:
+            current = word
+        elif font.prefix_widths(current + ' ' + word)[-1] <= max_width:
+            current = current + ' ' + word
+        else:
+            paragraphs.append(current)
+            current = word
+    paragraphs.append(current)
+    return paragraphs
+
+
+def line_starts_of(text_field: TextField):
+    return list(itertools.accumulate((line.num_paragraphs() for line in text_field.lines), initial=0))
+
+
+def key(k: int, mod: int = 0, unicode: str = '') -> pg.event.Event:
+    return pg.event.Event(pg.KEYDOWN, key=k, mod=mod, unicode=unicode)
+
+
+def focused_text_field(text: str, width: int = 200) -> TextField:
+    text_field = TextField(pg.Rect(0, 0, width, 200), text)
+    text_field.is_focused = True
+    return text_field
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_auto_wrap_matches_greedy_wrap(font, seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        text = random_text(rng, rng.randint(0, 40))
+        max_width = rng.randint(20, 400)
+        line = Line(text)
+        line.auto_wrap(font, max_width)
+        assert line.paragraphs == greedy_wrap(font, text, max_width)
+        assert line.text == text
+
+
+def test_auto_wrap_puts_long_word_on_its_own_paragraph(font):
+    line = Line('a ' + 'x' * 50 + ' b')
+    line.auto_wrap(font, 50)
+    assert line.paragraphs == ['a', 'x' * 50, 'b']
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_edits_keep_paragraphs_and_text_in_sync(font, seed):
+    rng = random.Random(seed)
+    line = Line(random_text(rng, 20))
+    line.auto_wrap(font, 150)
+    expected = line.text
+    for _ in range(200):
+        paragraph_index = rng.randrange(line.num_paragraphs())
+        char_index = rng.randint(0, line.paragraph_length(paragraph_index))
+        index = line.get_line_char_index(paragraph_index, char_index)
+        if rng.random() < 0.5:
+            inserted = rng.choice(['x', ' ', 'word', ' two words '])
+            line.insert_text(paragraph_index, char_index, inserted)
+            expected = expected[:index] + inserted + expected[index:]
+        else:
+            end_paragraph_index = rng.randrange(paragraph_index, line.num_paragraphs())
+            end_char_index = rng.randint(
+                char_index if end_paragraph_index == paragraph_index else 0,
+                line.paragraph_length(end_paragraph_index)
+            )
+            end_index = line.get_line_char_index(end_paragraph_index, end_char_index)
+            line.delete((paragraph_index, char_index), (end_paragraph_index, end_char_index))
+            expected = expected[:index] + expected[end_index:]
+        assert line.text == expected
+        assert ' '.join(line.paragraphs) == line.text
+        if rng.random() < 0.3:
+            line.auto_wrap(font, rng.randint(40, 300))
+            assert ' '.join(line.paragraphs) == expected
+
+
+def test_line_starts_follow_wrap_line():
+    text_field = focused_text_field('first line\nsecond\nthird line here', width=120)
+    text_field._get_line_starts()
+    text_field.cursor = Cursor(1, 0, 6)
+    for char in ' with many more words, so it wraps':
+        text_field.handle_event(key(0, unicode=char))
+        assert list(text_field._get_line_starts()) == line_starts_of(text_field)
+    assert text_field.lines[1].num_paragraphs() > 1
+
+
+def test_line_starts_follow_create_newline():
+    text_field = focused_text_field('one two three four five six seven eight\nlast', width=120)
+    text_field._get_line_starts()
+    text_field.cursor = Cursor(0, 1, 2)
+    for _ in range(3):
+        text_field.handle_event(key(pg.K_RETURN))
+        assert list(text_field._get_line_starts()) == line_starts_of(text_field)
+    assert text_field.get_text().count('\n') == 4
+
+
+def test_cursor_moves_across_wrap():
+    text_field = focused_text_field('one two three four five six seven eight', width=120)
+    line = text_field.lines[0]
+    assert line.num_paragraphs() > 1
+    end_of_first = Cursor(0, 0, line.paragraph_length(0))
+
+    text_field.cursor = end_of_first.copy()
+    text_field.handle_event(key(pg.K_RIGHT))
+    assert text_field.cursor == Cursor(0, 1, 0)
+    text_field.handle_event(key(pg.K_LEFT))
+    assert text_field.cursor == end_of_first
+
+
+def test_cursor_moves_across_line_end():
+    text_field = focused_text_field('abc\ndef')
+    text_field.cursor = Cursor(0, 0, 3)
+    text_field.handle_event(key(pg.K_RIGHT))
+    assert text_field.cursor == Cursor(1, 0, 0)
+    text_field.handle_event(key(pg.K_LEFT))
+    assert text_field.cursor == Cursor(0, 0, 3)
+
+    # The cursor stays at the start and end of the text
+    text_field.cursor = Cursor(0, 0, 0)
+    text_field.handle_event(key(pg.K_LEFT))
+    assert text_field.cursor == Cursor(0, 0, 0)
+    text_field.cursor = Cursor(1, 0, 3)
+    text_field.handle_event(key(pg.K_RIGHT))
+    assert text_field.cursor == Cursor(1, 0, 3)
+
+
+def test_word_jump_passes_over_wrap():
+    text_field = focused_text_field('one two three four five six seven eight', width=120)
+    line = text_field.lines[0]
+    text_field.cursor = Cursor(0, 0, line.paragraph_length(0))
+    text_field.handle_event(key(pg.K_RIGHT, pg.KMOD_CTRL))
+    # The jump ends at the space after the first word of the next paragraph, not at the start of the paragraph
+    first_word = line.paragraph(1).split(' ')[0]
+    assert text_field.cursor == Cursor(0, 1, len(first_word))